@@ -1,63 +1,296 @@
 import itertools
+import multiprocessing
+import sys
+from functools import lru_cache, partial
 
+try:
+    import ahocorasick  # Optional: pyahocorasick, only needed for the automaton-based segmenter
+except ImportError:
+    ahocorasick = None
 
+# Segmenter state shared by all calls once init_segmenter has run; read-only afterwards
+_DICT = frozenset()
+_CANONICAL_MAP = {}
+_TRIE = None
+_REVERSED_TRIE = None
+
+# Tries built for an explicitly passed dictionary, keyed by direction and memoized across calls.
+# The memo is cleared whenever a different dictionary object or different variant groups are passed in.
+_explicit_trie_cache = {'dictionary': None, 'variants': None, 'tries': {}}
+
+
+@lru_cache(maxsize=None)
 def load_variant_dict(file_path):
     """
     Load the variant character dictionary.
-    Returns a list of variant character groups.
+    Returns a tuple of variant character groups; the file is read only once per path.
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        data_str = f.readline()
+        return tuple(data_str.split("|"))
+
+
+def load_dictionary(file_path):
+    """
+    Load the segmentation dictionary, one word per line.
+    Only the first whitespace-separated field of each line is used as the word.
     """
     with open(file_path, 'r', encoding='utf-8') as f:
-        data_str = f.readlines()[0]
-        return data_str.split("|")
+        return frozenset(line.split()[0] for line in f if line.strip())
+
+
+def build_canonical_map(variant_lst):
+    """
+    Map every variant character to one representative character of its group.
+    Groups that share a character are merged, so each character has a single canonical form.
+    Returns a str.translate table, so normalizing a word is a single C-level pass.
+    """
+    parent = {}
+
+    def find(char):
+        while parent[char] != char:
+            parent[char] = parent[parent[char]]
+            char = parent[char]
+        return char
+
+    for group in variant_lst:
+        chars = list(itertools.chain.from_iterable(group.split()))
+        for char in chars:
+            parent.setdefault(char, char)
+        if chars:
+            root = find(chars[0])
+            for char in chars[1:]:
+                other = find(char)
+                if other != root:
+                    parent[other] = root
+
+    return str.maketrans({char: find(char) for char in parent if find(char) != char})
+
+
+def normalize_word(word, canonical_map):
+    """Normalize a word with a canonical map from build_canonical_map."""
+    return word.translate(canonical_map)
+
+
+class TrieNode:
+    """
+    A node of the dictionary trie used for maximum matching.
+    """
+    __slots__ = ('children', 'is_word')
+
+    def __init__(self):
+        self.children = {}
+        self.is_word = False
+
+
+class TrieRoot(TrieNode):
+    """
+    The root node of a trie, remembering the canonical map its words were normalized with,
+    so that sentences can be normalized the same way before matching.
+    """
+    __slots__ = ('canonical_map',)
+
+    def __init__(self, canonical_map=None):
+        super().__init__()
+        self.canonical_map = canonical_map or {}
+
+
+def build_trie(dictionary_set, canonical_map=None, reverse=False):
+    """
+    Build a character trie from the dictionary words.
+    Words are normalized with canonical_map when given; with reverse=True each word
+    is inserted back to front, as needed by RMM. The canonical map is kept on the root.
+    """
+    root = TrieRoot(canonical_map)
+    for word in dictionary_set:
+        if canonical_map:
+            word = normalize_word(word, canonical_map)
+        node = root
+        for char in (reversed(word) if reverse else word):
+            node = node.children.setdefault(char, TrieNode())
+        node.is_word = True
+    return root
+
+
+def longest_prefix_match(trie, text):
+    """
+    Walk the trie along text and return the length of the longest dictionary word
+    at its start, or 1 when there is none.
+    """
+    node = trie
+    match_length = 1
+    for i, char in enumerate(text):
+        node = node.children.get(char)
+        if node is None:
+            break
+        if node.is_word:
+            match_length = i + 1
+    return match_length
+
+
+def init_segmenter(dict_path, variant_path):
+    """
+    Load the dictionary and variant groups once and share them as module-level state,
+    so that fmm_segmentation and rmm_segmentation can be called with the sentence only.
+    """
+    global _DICT, _CANONICAL_MAP, _TRIE, _REVERSED_TRIE
+    _DICT = load_dictionary(dict_path)
+    _CANONICAL_MAP = build_canonical_map(load_variant_dict(variant_path))
+    _TRIE = build_trie(_DICT, _CANONICAL_MAP)
+    _REVERSED_TRIE = build_trie(_DICT, _CANONICAL_MAP, reverse=True)
+    _match_forward.cache_clear()
+    _match_backward.cache_clear()
+
+
+def cached_trie(dictionary_set, variant_lst=(), reverse=False):
+    """
+    Return the trie for an explicitly passed dictionary and variant groups, building it
+    only on the first call. The dictionary is recognized by identity, so it must not be
+    modified in place between calls.
+    """
+    cache = _explicit_trie_cache
+    variants = tuple(variant_lst)
+    if cache['dictionary'] is not dictionary_set or cache['variants'] != variants:
+        cache['dictionary'] = dictionary_set
+        cache['variants'] = variants
+        cache['tries'] = {}
 
+    tries = cache['tries']
+    if reverse not in tries:
+        canonical_map = build_canonical_map(variants)
+        tries[reverse] = build_trie(dictionary_set, canonical_map, reverse=reverse)
+    return tries[reverse]
 
-def generate_combinations(variants_list):
+
+def trie_canonical_map(trie, variant_lst=()):
     """
-    Generate all possible combinations of variant characters for a given string.
+    Return the canonical map a trie was built with; tries not built by build_trie
+    fall back to a map from variant_lst.
     """
-    for variant in itertools.product(*variants_list):
-        yield ''.join(variant)
+    if isinstance(trie, TrieRoot):
+        return trie.canonical_map
+    return build_canonical_map(variant_lst)
+
+
+def _check_initialized():
+    """Fail early when the shared segmenter state has not been loaded."""
+    if _TRIE is None:
+        raise RuntimeError("Call init_segmenter before segmenting without an explicit dictionary.")
 
 
-def fmm_segmentation(sentence, dictionary_set, variant_lst, max_word_length=5):
+def _shared_canonical_map(reverse=False):
+    """
+    Canonical map of the shared trie loaded by init_segmenter, taken from the trie root
+    so that the map and the trie always come from the same state.
+    """
+    return trie_canonical_map(_REVERSED_TRIE if reverse else _TRIE)
+
+
+@lru_cache(maxsize=100_000)
+def _match_forward(window):
+    """Longest match at the start of a normalized window, memoized for recurring windows."""
+    return longest_prefix_match(_TRIE, window)
+
+
+@lru_cache(maxsize=100_000)
+def _match_backward(window):
+    """Longest match at the end of a normalized window, memoized for recurring windows."""
+    return longest_prefix_match(_REVERSED_TRIE, window[::-1])
+
+
+def fmm_segmentation(sentence, dictionary_set=None, variant_lst=(), max_word_length=5):
     """
     Forward Maximum Matching (FMM) segmentation with variant character handling.
+    Without dictionary_set, the dictionary and variants loaded by init_segmenter are used.
+    An explicit dictionary_set is turned into a trie once and reused across calls;
+    it may also be a trie prebuilt with build_trie, whose own canonical map is then used.
     """
-    words = list(sentence)
+    if dictionary_set is None:
+        _check_initialized()
+        canonical_map = _shared_canonical_map()
+        match_at = _match_forward
+    else:
+        if isinstance(dictionary_set, TrieNode):
+            trie = dictionary_set
+        else:
+            trie = cached_trie(dictionary_set, variant_lst)
+        # Normalize sentences with the same map the trie's words were normalized with
+        canonical_map = trie_canonical_map(trie, variant_lst)
+        match_at = partial(longest_prefix_match, trie)
+
+    # Match against the canonical spelling but emit the original characters
+    normalized = normalize_word(sentence, canonical_map)
     result = []
     start = 0
-    current_length = max_word_length
-
-    while start < len(words):
-        word = ''.join(words[start:start + current_length])
-        word_variants_list = []
-
-        # Build variant combinations for each character in the current substring
-        for char in word:
-            char_variants_list = []
-            if any(char in s for s in variant_lst):
-                pos = [idx for idx, lst in enumerate(variant_lst) if char in lst]
-                for idx in pos:
-                    variants = variant_lst[idx]
-                    for v in variants.split():
-                        char_variants_list.extend(v)
-                char_variants_list = list(set(char_variants_list))
-                word_variants_list.append("".join(char_variants_list))
-            else:
-                word_variants_list.append(char)
-
-        combinations = list(generate_combinations(word_variants_list))
-
-        # Check if any variant combination exists in the dictionary
-        if any(combination in dictionary_set for combination in combinations):
-            result.append(word)
-            start += current_length
-            current_length = max_word_length
-        else:
-            current_length -= 1
-            # If length reduces to 1, treat it as a single-character word or punctuation
-            if current_length <= 1:
-                result.append(words[start])
-                start += 1
-                current_length = max_word_length
+
+    while start < len(sentence):
+        # Longest window starting here that is a dictionary word;
+        # a match of length 1 is a single-character word or punctuation
+        match_length = match_at(normalized[start:start + max_word_length])
+        result.append(sentence[start:start + match_length])
+        start += match_length
+    return result
+
+
+def segment_corpus(sentences, dict_path, variant_path, segment_func=fmm_segmentation,
+                   processes=None, chunksize=64):
+    """
+    Segment a corpus of sentences in parallel worker processes.
+    segment_func is called with the sentence only (fmm_segmentation or rmm_segmentation),
+    using the shared state loaded by init_segmenter.
+    """
+    init_segmenter(dict_path, variant_path)
+    if sys.platform.startswith('linux'):
+        # Forked workers inherit the loaded tries copy-on-write instead of reloading them;
+        # other platforms keep their default start method, since forking is unsafe on macOS
+        context = multiprocessing.get_context('fork')
+        pool_args = {}
+    else:
+        context = multiprocessing.get_context()
+        pool_args = {'initializer': init_segmenter, 'initargs': (dict_path, variant_path)}
+
+    with context.Pool(processes=processes, **pool_args) as pool:
+        return pool.map(segment_func, sentences, chunksize=chunksize)
+
+
+def build_automaton(dictionary_set, canonical_map, max_word_length=5):
+    """
+    Build an Aho-Corasick automaton over the dictionary for corpus-level segmentation.
+    Words are inserted in their canonical spelling (see build_canonical_map), so the
+    automaton is matched against normalized sentences. Requires pyahocorasick.
+    """
+    if ahocorasick is None:
+        raise ImportError("pyahocorasick is required to build the Aho-Corasick automaton.")
+
+    automaton = ahocorasick.Automaton()
+    for word in dictionary_set:
+        # Single characters are emitted as-is, so only multi-character words matter
+        if 2 <= len(word) <= max_word_length:
+            automaton.add_word(normalize_word(word, canonical_map), len(word))
+    automaton.make_automaton()
+    return automaton
+
+
+def fmm_segmentation_ac(sentence, automaton, canonical_map):
+    """
+    Forward Maximum Matching (FMM) segmentation driven by an automaton from build_automaton.
+    One pass over the normalized sentence collects every dictionary match, then the greedy
+    cursor takes the longest match starting at each position.
+    """
+    # An automaton without any words cannot be iterated
+    if not len(automaton):
+        return list(sentence)
+
+    longest_from = {}
+    for end_index, length in automaton.iter(normalize_word(sentence, canonical_map)):
+        start = end_index - length + 1
+        if length > longest_from.get(start, 1):
+            longest_from[start] = length
+
+    result = []
+    start = 0
+    while start < len(sentence):
+        match_length = longest_from.get(start, 1)
+        result.append(sentence[start:start + match_length])
+        start += match_length
     return result
\ No newline at end of file
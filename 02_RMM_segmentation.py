@@ -1,51 +1,65 @@
-import itertools
+# Note: load_variant_dict, load_dictionary, build_canonical_map, normalize_word, TrieNode,
+# TrieRoot, build_trie, longest_prefix_match, init_segmenter, cached_trie, trie_canonical_map,
+# _check_initialized, _shared_canonical_map, _match_backward and build_automaton are identical
+# to 01_FMM_segmentation.py
 
-
-# Note: load_variant_dict and generate_combinations are identical to 01_FMM_segmentation.py
-
-def rmm_segmentation(sentence, dictionary_set, variant_lst, max_word_length=5):
+def rmm_segmentation(sentence, dictionary_set=None, variant_lst=(), max_word_length=5):
     """
     Reverse Maximum Matching (RMM) segmentation with variant character handling.
     Matches from the end of the sentence to the beginning.
+    Without dictionary_set, the dictionary and variants loaded by init_segmenter are used.
+    An explicit dictionary_set is turned into a reversed trie once and reused across calls;
+    it may also be a trie prebuilt with build_trie(..., reverse=True), whose own canonical
+    map is then used.
     """
-    words = list(sentence)
+    if dictionary_set is None:
+        _check_initialized()
+        canonical_map = _shared_canonical_map(reverse=True)
+        match_at = _match_backward
+    else:
+        if isinstance(dictionary_set, TrieNode):
+            trie = dictionary_set
+        else:
+            trie = cached_trie(dictionary_set, variant_lst, reverse=True)
+        # Normalize sentences with the same map the trie's words were normalized with
+        canonical_map = trie_canonical_map(trie, variant_lst)
+
+        def match_at(window):
+            return longest_prefix_match(trie, window[::-1])
+
+    # Match against the canonical spelling but emit the original characters
+    normalized = normalize_word(sentence, canonical_map)
     result = []
-    end = len(words)
-    current_length = max_word_length
+    end = len(sentence)
 
     while end > 0:
-        # Prevent index out of bounds
-        if end < current_length:
-            current_length = end
-
-        word = ''.join(words[end - current_length:end])
-        word_variants_list = []
-
-        # Build variant combinations
-        for char in word:
-            char_variants_list = []
-            if any(char in s for s in variant_lst):
-                pos = [idx for idx, lst in enumerate(variant_lst) if char in lst]
-                for idx in pos:
-                    variants = variant_lst[idx]
-                    for v in variants.split():
-                        char_variants_list.extend(v)
-                char_variants_list = list(set(char_variants_list))
-                word_variants_list.append("".join(char_variants_list))
-            else:
-                word_variants_list.append(char)
-
-        combinations = list(generate_combinations(word_variants_list))
-
-        # Dictionary matching
-        if any(combination in dictionary_set for combination in combinations):
-            result.insert(0, word)  # Insert at the beginning for reverse matching
-            end -= current_length
-            current_length = max_word_length
-        else:
-            current_length -= 1
-            if current_length <= 1:
-                result.insert(0, words[end - 1])
-                end -= 1
-                current_length = max_word_length
-    return result
\ No newline at end of file
+        # Longest window ending here that is a dictionary word
+        match_length = match_at(normalized[max(end - max_word_length, 0):end])
+        result.append(sentence[end - match_length:end])  # Collected back to front
+        end -= match_length
+    return result[::-1]
+
+
+def rmm_segmentation_ac(sentence, automaton, canonical_map):
+    """
+    Reverse Maximum Matching (RMM) segmentation driven by an automaton from build_automaton.
+    One pass over the normalized sentence collects every dictionary match, then the cursor
+    moves from the end, taking the longest match ending at each position.
+    """
+    # An automaton without any words cannot be iterated
+    if not len(automaton):
+        return list(sentence)
+
+    longest_to = {}
+    for end_index, length in automaton.iter(normalize_word(sentence, canonical_map)):
+        end = end_index + 1
+        if length > longest_to.get(end, 1):
+            longest_to[end] = length
+
+    result = []
+    end = len(sentence)
+    while end > 0:
+        match_length = longest_to.get(end, 1)
+        result.append(sentence[end - match_length:end])  # Collected back to front
+        end -= match_length
+    return result[::-1]
\ No newline at end of file
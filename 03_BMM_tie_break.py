@@ -1,14 +1,66 @@
-def count_weight(segmented_list, reference_string):
+try:
+    import ahocorasick  # Optional: pyahocorasick, counts all words in a single pass
+except ImportError:
+    ahocorasick = None
+
+# Word counts memoized across bmm_tie_break calls, one memo per reference string role.
+# A memo is cleared whenever a different reference string is passed in.
+_doc_count_cache = {'reference': None, 'counts': {}}
+_all_count_cache = {'reference': None, 'counts': {}}
+
+
+def count_occurrences(words, reference_string):
+    """
+    Count the non-overlapping occurrences of each word in the reference string,
+    with the same semantics as str.count. When pyahocorasick is available all words
+    are counted in one pass over the reference string instead of one pass per word.
+    """
+    words = set(words)
+    if ahocorasick is None or not words:
+        return {word: reference_string.count(word) for word in words}
+
+    automaton = ahocorasick.Automaton()
+    for word in words:
+        automaton.add_word(word, word)
+    automaton.make_automaton()
+
+    counts = dict.fromkeys(words, 0)
+    last_end = {}
+    for end_index, word in automaton.iter(reference_string):
+        # Skip matches overlapping the previous counted occurrence of the same word
+        if end_index - len(word) >= last_end.get(word, -1):
+            counts[word] += 1
+            last_end[word] = end_index
+    return counts
+
+
+def cached_occurrences(words, reference_string, cache):
+    """
+    Return memoized occurrence counts for reference_string, scanning only for words
+    that have not been counted in it yet.
+    """
+    if cache['reference'] != reference_string:
+        cache['reference'] = reference_string
+        cache['counts'] = {}
+
+    counts = cache['counts']
+    missing = [word for word in set(words) if word not in counts]
+    if missing:
+        counts.update(count_occurrences(missing, reference_string))
+    return counts
+
+
+def count_weight(segmented_list, reference_string, counts=None):
     """
     Calculate the dynamic frequency weight of multi-character words
     in the provided reference string (str_doc or str_all).
+    Precomputed counts from count_occurrences may be passed to skip the scan.
     """
-    weight = 0
-    for word in segmented_list:
-        if len(word) >= 2:
-            # On-the-fly frequency counting using native string matching
-            weight += reference_string.count(word)
-    return weight
+    multi_char_words = [word for word in segmented_list if len(word) >= 2]
+    if counts is None:
+        # On-the-fly frequency counting over the reference string
+        counts = count_occurrences(multi_char_words, reference_string)
+    return sum(counts[word] for word in multi_char_words)
 
 
 def bmm_tie_break(f_res, r_res, str_doc, str_all):
@@ -25,20 +77,25 @@ def bmm_tie_break(f_res, r_res, str_doc, str_all):
         return f_res if len(f_res) < len(r_res) else r_res
 
     # Rule 3: Longer maximum word length
-    f_max_len = max([len(w) for w in f_res]) if f_res else 0
-    r_max_len = max([len(w) for w in r_res]) if r_res else 0
+    f_max_len = max(map(len, f_res), default=0)
+    r_max_len = max(map(len, r_res), default=0)
     if f_max_len != r_max_len:
         return f_res if f_max_len > r_max_len else r_res
 
+    # Both candidates are counted together, and only words not yet memoized are scanned
+    candidate_words = [word for word in f_res + r_res if len(word) >= 2]
+
     # Rule 4: Higher frequency weight in the current document
-    f_doc_weight = count_weight(f_res, str_doc)
-    r_doc_weight = count_weight(r_res, str_doc)
+    doc_counts = cached_occurrences(candidate_words, str_doc, _doc_count_cache)
+    f_doc_weight = count_weight(f_res, str_doc, doc_counts)
+    r_doc_weight = count_weight(r_res, str_doc, doc_counts)
     if f_doc_weight != r_doc_weight:
         return f_res if f_doc_weight > r_doc_weight else r_res
 
     # Rule 5: Higher frequency weight in the entire corpus
-    f_all_weight = count_weight(f_res, str_all)
-    r_all_weight = count_weight(r_res, str_all)
+    all_counts = cached_occurrences(candidate_words, str_all, _all_count_cache)
+    f_all_weight = count_weight(f_res, str_all, all_counts)
+    r_all_weight = count_weight(r_res, str_all, all_counts)
     if f_all_weight != r_all_weight:
         return f_res if f_all_weight > r_all_weight else r_res
 
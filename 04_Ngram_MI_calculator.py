@@ -1,6 +1,7 @@
-import math
+import numpy as np
 import pandas as pd
 from collections import Counter
+from itertools import islice
 
 
 def calculate_mixed_element_mi(segmented_text_string):
@@ -10,30 +11,22 @@ def calculate_mixed_element_mi(segmented_text_string):
     # Parse the space-delimited text into a sequence of discrete tokens
     tokens = segmented_text_string.split()
     total_tokens = len(tokens)
+    unigram_counts = Counter(tokens)
 
-    # Generate continuous 2-gram pairs from tokens
-    bigrams = [(tokens[i], tokens[i + 1]) for i in range(len(tokens) - 1)]
-    bigram_counts = Counter(bigrams)
+    # Stream continuous 2-gram pairs from tokens straight into the counter
+    bigram_counts = Counter(zip(tokens, islice(tokens, 1, None)))
 
-    df = pd.DataFrame.from_dict(bigram_counts, orient='index', columns=['f_xy'])
-    df.index.rename('2-gram', inplace=True)
-    df.reset_index(inplace=True)
+    # Filter frequencies >= 20 and build the x and y columns directly from the pairs
+    rows = [(gram_x, gram_y, f_xy) for (gram_x, gram_y), f_xy in bigram_counts.items() if f_xy >= 20]
+    df = pd.DataFrame(rows, columns=['gram_x', 'gram_y', 'f_xy'])
 
-    # Filter frequencies >= 20
-    df = df[df['f_xy'] >= 20]
+    # Token frequencies for individual elements
+    df['f_x'] = df['gram_x'].map(unigram_counts)
+    df['f_y'] = df['gram_y'].map(unigram_counts)
 
-    # Split tuples into x and y columns
-    df[['gram_x', 'gram_y']] = pd.DataFrame(df['2-gram'].tolist(), index=df.index)
-
-    # Dynamic frequency counting for individual elements
-    df['f_x'] = df['gram_x'].apply(lambda x: segmented_text_string.count(x))
-    df['f_y'] = df['gram_y'].apply(lambda y: segmented_text_string.count(y))
-
-    # Calculate Mutual Information
-    df['MI'] = df.apply(
-        lambda row: math.log((row['f_xy'] * total_tokens) / (row['f_x'] * row['f_y']), 2)
-        if (row['f_x'] * row['f_y']) > 0 else 0,
-        axis=1
-    )
+    # Calculate Mutual Information on the underlying arrays
+    f_xy = df['f_xy'].to_numpy(dtype=np.float64)
+    denom = df['f_x'].to_numpy(dtype=np.float64) * df['f_y'].to_numpy(dtype=np.float64)
+    df['MI'] = np.where(denom > 0, np.log2((f_xy * total_tokens) / np.maximum(denom, 1)), 0.0)
 
     return df
\ No newline at end of file
@@ -1,14 +1,62 @@
 import os
-import math
+import numpy as np
 import pandas as pd
 from collections import Counter
+from itertools import islice
+
+try:
+    from numba import njit, prange  # Optional: JIT-compiles the MMI kernel
+except ImportError:
+    njit = None
+    prange = range
 
 
 def get_ngrams(tokens, n):
     """
-    Generate n-grams from a list of tokens.
+    Lazily generate n-grams from a list of tokens, without materializing them in a list.
+    """
+    return zip(*(islice(tokens, i, None) for i in range(n)))
+
+
+def count_frequent_ngrams(tokens, n, min_freq):
+    """
+    Count n-grams and immediately drop those occurring fewer than min_freq times.
+    """
+    counts = Counter(get_ngrams(tokens, n))
+    return {gram: freq for gram, freq in counts.items() if freq >= min_freq}
+
+
+def _mmi_scores_numpy(freqs, left_freqs, right_freqs, total_tokens):
+    """
+    Vectorized MMI kernel. left_freqs and right_freqs hold one row per split position
+    and one column per n-gram.
+    """
+    split_probs = (left_freqs / total_tokens) * (right_freqs / total_tokens)
+    avg_split_prob = split_probs.mean(axis=0)
+    has_splits = avg_split_prob > 0
+    return np.where(has_splits, np.log2((freqs / total_tokens) / np.where(has_splits, avg_split_prob, 1)), 0.0)
+
+
+def _mmi_scores_loop(freqs, left_freqs, right_freqs, total_tokens):
+    """
+    Loop form of the MMI kernel, used when numba is available to compile it.
     """
-    return [tuple(tokens[i:i + n]) for i in range(len(tokens) - n + 1)]
+    n_splits, n_grams = left_freqs.shape
+    mmi_values = np.zeros(n_grams)
+    for i in prange(n_grams):
+        split_sum = 0.0
+        for k in range(n_splits):
+            split_sum += (left_freqs[k, i] / total_tokens) * (right_freqs[k, i] / total_tokens)
+        avg_split_prob = split_sum / n_splits
+        if avg_split_prob > 0:
+            mmi_values[i] = np.log2((freqs[i] / total_tokens) / avg_split_prob)
+    return mmi_values
+
+
+if njit is not None:
+    compute_mmi_scores = njit(parallel=True, fastmath=True, cache=True)(_mmi_scores_loop)
+else:
+    compute_mmi_scores = _mmi_scores_numpy
 
 
 def calculate_mmi_for_ngrams(segmented_text_string, min_n=3, max_n=5, min_freq=5):
@@ -21,51 +69,54 @@ def calculate_mmi_for_ngrams(segmented_text_string, min_n=3, max_n=5, min_freq=5
     tokens = segmented_text_string.split()
     total_tokens = len(tokens)
 
-    # Pre-calculate token and sub-gram frequencies to optimize speed
+    # Pre-calculate token and sub-gram frequencies to optimize speed.
+    # Every part of an n-gram occurs at least as often as the n-gram itself, so only
+    # sub-grams reaching min_freq are ever looked up and the long tail can be dropped.
     print("Pre-calculating sub-gram frequencies...")
     sub_gram_counters = {}
     for k in range(1, max_n):
-        sub_gram_counters[k] = Counter(get_ngrams(tokens, k))
+        sub_gram_counters[k] = count_frequent_ngrams(tokens, k, min_freq)
 
-    all_mmi_results = []
+    mmi_frames = []
 
     # Iterate through specified n-gram lengths (e.g., 3 to 5)
     for n in range(min_n, max_n + 1):
-        print(f"Calculating MMI for {n}-grams...")
-        ngrams_list = get_ngrams(tokens, n)
-        ngram_counts = Counter(ngrams_list)
-
-        for gram_tuple, freq in ngram_counts.items():
-            if freq < min_freq:
-                continue  # Filter out low-frequency noise
-
-            p_xyz = freq / total_tokens
-            split_probs = []
+        if n < 2:
+            continue  # A single token has no binary split, so its MMI is never positive
 
-            # Calculate probabilities for all possible binary splits of the n-gram
-            for k in range(1, n):
-                left_part = gram_tuple[:k]
-                right_part = gram_tuple[k:]
-
-                p_left = sub_gram_counters[k].get(left_part, 0) / total_tokens
-                p_right = sub_gram_counters[n - k].get(right_part, 0) / total_tokens
-                split_probs.append(p_left * p_right)
-
-            # Calculate the arithmetic mean of the split probabilities
-            avg_split_prob = sum(split_probs) / len(split_probs) if split_probs else 1
-
-            # Calculate MMI: log2( P(whole) / avg_split_prob )
-            mmi_value = math.log2(p_xyz / avg_split_prob) if avg_split_prob > 0 else 0
-
-            if mmi_value > 0:
-                all_mmi_results.append({
-                    'n-gram_length': n,
-                    'word': "".join(gram_tuple),
-                    'frequency': freq,
-                    'MMI': round(mmi_value, 4)
-                })
-
-    df = pd.DataFrame(all_mmi_results)
+        print(f"Calculating MMI for {n}-grams...")
+        # Low-frequency noise is already filtered out; shorter lengths reuse the sub-gram counts
+        if n in sub_gram_counters:
+            ngram_counts = sub_gram_counters[n]
+        else:
+            ngram_counts = count_frequent_ngrams(tokens, n, min_freq)
+
+        grams = list(ngram_counts)
+        if not grams:
+            continue
+        freqs = np.fromiter((ngram_counts[g] for g in grams), dtype=np.int64, count=len(grams))
+
+        # Gather the frequencies of both parts for all possible binary splits of every n-gram
+        left_freqs = np.empty((n - 1, len(grams)))
+        right_freqs = np.empty((n - 1, len(grams)))
+        for k in range(1, n):
+            left_counter = sub_gram_counters[k]
+            right_counter = sub_gram_counters[n - k]
+            left_freqs[k - 1] = np.fromiter((left_counter[g[:k]] for g in grams), dtype=np.float64, count=len(grams))
+            right_freqs[k - 1] = np.fromiter((right_counter[g[k:]] for g in grams), dtype=np.float64, count=len(grams))
+
+        # Calculate MMI: log2( P(whole) / mean of the split probabilities )
+        mmi_values = compute_mmi_scores(freqs, left_freqs, right_freqs, total_tokens)
+
+        keep = np.flatnonzero(mmi_values > 0)
+        mmi_frames.append(pd.DataFrame({
+            'n-gram_length': n,
+            'word': ["".join(grams[i]) for i in keep],
+            'frequency': freqs[keep],
+            'MMI': np.round(mmi_values[keep], 4)
+        }))
+
+    df = pd.concat(mmi_frames, ignore_index=True) if mmi_frames else pd.DataFrame()
     if not df.empty:
         df = df.sort_values(by='MMI', ascending=False)
     return df
@@ -38,6 +38,14 @@ def proportional_stratified_sampling(metadata_excel_path, total_samples=100):
     return pd.concat(sampled_dfs) if sampled_dfs else pd.DataFrame()
 
 
+def decode_window(window):
+    """
+    Decode a byte window read from the middle of a UTF-8 file.
+    Partial characters at the window edges are dropped by errors='ignore'.
+    """
+    return window.decode('utf-8', errors='ignore').replace('\r\n', '\n')
+
+
 def extract_random_text_snippets(sampled_df, input_text_dir, snippet_length=100):
     """
     Extract a random continuous snippet of fixed length from the sampled files.
@@ -53,15 +61,34 @@ def extract_random_text_snippets(sampled_df, input_text_dir, snippet_length=100)
             print(f"File not found: {filename}")
             continue
 
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        # Extract random snippet
-        if len(content) <= snippet_length:
-            snippet = content  # Take whole text if shorter than required length
+        # UTF-8 needs at most 4 bytes per character; the spare bytes cover
+        # characters cut in half at either end of the window
+        window_bytes = (snippet_length + 2) * 4
+        file_size = os.path.getsize(filepath)
+
+        if file_size <= window_bytes:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                content = f.read()
+
+            # Extract random snippet
+            if len(content) <= snippet_length:
+                snippet = content  # Take whole text if shorter than required length
+            else:
+                start_idx = random.randint(0, len(content) - snippet_length)
+                snippet = content[start_idx: start_idx + snippet_length]
         else:
-            start_idx = random.randint(0, len(content) - snippet_length)
-            snippet = content[start_idx: start_idx + snippet_length]
+            # Read only a window at a random byte offset instead of the whole file;
+            # any byte may start the window, so snippets can reach the end of the file
+            with open(filepath, 'rb') as f:
+                f.seek(random.randint(0, file_size - 1))
+                content = decode_window(f.read(window_bytes))
+
+                if len(content) < snippet_length:
+                    # Too close to the end for a full snippet: redraw from the offsets that
+                    # always leave a full window, rather than piling draws onto the last snippet
+                    f.seek(random.randint(0, file_size - window_bytes))
+                    content = decode_window(f.read(window_bytes))
+            snippet = content[:snippet_length]
 
         extracted_data.append({
             'Filename': filename,
@@ -12,12 +12,22 @@ ABSOLUTE_DROP_FLOOR = 0.02
 DROP_SENSITIVITY = 1.0
 STEP_SIZE = 1.0
 
+def build_translation_table(variant_map):
+    """Build a str.translate table that maps variant characters to their standard forms."""
+    return str.maketrans(variant_map)
+
 def normalize_word(word, variant_map):
     """Normalize a word by mapping variant characters to their standard forms."""
     if not isinstance(word, str):
         return str(word)
     return "".join([variant_map.get(c, c) for c in word])
 
+def translate_word(word, trans_table):
+    """Normalize a word with a translation table from build_translation_table."""
+    if not isinstance(word, str):
+        return str(word)
+    return word.translate(trans_table)
+
 def calculate_mmi_interval_statistics(candidate_df, ref_set, v_map, score_col='MMI', step_size=1.0):
     """
     Segment the MMI candidates into intervals and calculate the precision
@@ -27,41 +37,38 @@ def calculate_mmi_interval_statistics(candidate_df, ref_set, v_map, score_col='M
     min_val = math.floor(candidate_df[score_col].min() / step_size) * step_size
 
     bins = np.arange(min_val, max_val + step_size, step_size)
-    bins = sorted(bins, reverse=True)
-
-    stats = []
-    cumulative_count = 0
-
-    for i in range(len(bins) - 1):
-        high = bins[i]
-        low = bins[i + 1]
-
-        if i == 0:
-            mask = (candidate_df[score_col] >= low) & (candidate_df[score_col] <= high + 0.001)
-        else:
-            mask = (candidate_df[score_col] >= low) & (candidate_df[score_col] < high)
-
-        subset = candidate_df[mask]
-        count = len(subset)
-
-        if count == 0:
-            continue
-
-        in_ref_count = sum(1 for w in subset['word'] if normalize_word(w, v_map) in ref_set)
-        coverage = in_ref_count / count if count > 0 else 0
-        new_words = count - in_ref_count
-        cumulative_count += count
-
-        stats.append({
-            'Interval_Start': low,
-            'Interval_End': high,
-            'Interval_Label': f"{high:.1f}-{low:.1f}", # High to low label format
-            'Total_Words': count,
-            'In_Ref_Count': in_ref_count,
-            'New_Words': new_words,
-            'Coverage_Rate': coverage,
-            'Cumulative_Words': cumulative_count
-        })
+    if len(bins) < 2:
+        return pd.DataFrame()
+
+    # Assign every candidate to its [low, high) interval in one pass;
+    # the top edge is widened so the maximum score falls into the highest interval
+    edges = bins.copy()
+    edges[-1] += 0.001
+    interval_idx = pd.cut(candidate_df[score_col], bins=edges, right=False, labels=False)
+
+    # Normalize every candidate once through a single translation table
+    trans_table = build_translation_table(v_map)
+    normalized_words = candidate_df['word'].map(lambda w: translate_word(w, trans_table))
+    in_ref = normalized_words.isin(ref_set)
+
+    # Aggregate per non-empty interval, ordered from highest score to lowest
+    grouped = in_ref.groupby(interval_idx).agg(['size', 'sum']).sort_index(ascending=False)
+    idx = grouped.index.to_numpy(dtype=int)
+    low = bins[idx]
+    high = bins[idx + 1]
+    count = grouped['size'].to_numpy()
+    in_ref_count = grouped['sum'].to_numpy(dtype=int)
+
+    stats = {
+        'Interval_Start': low,
+        'Interval_End': high,
+        'Interval_Label': [f"{hi:.1f}-{lo:.1f}" for lo, hi in zip(low, high)],  # High to low label format
+        'Total_Words': count,
+        'In_Ref_Count': in_ref_count,
+        'New_Words': count - in_ref_count,
+        'Coverage_Rate': in_ref_count / count,
+        'Cumulative_Words': count.cumsum()
+    }
 
     return pd.DataFrame(stats)
 
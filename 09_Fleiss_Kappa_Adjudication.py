@@ -1,6 +1,13 @@
 import os
 import numpy as np
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+
+try:
+    from numba import njit  # Optional: JIT-compiles the boundary extraction loop
+except ImportError:
+    njit = None
 
 
 # ==============================================================================
@@ -11,6 +18,21 @@ from collections import Counter
 #              are marked with "[?]" for subsequent manual adjudication.
 # ==============================================================================
 
+# Lookup table of the code points that str.split() treats as token separators
+# (none lies above U+3000), indexed by code point. The final False entry stands in
+# for every higher code point, so lookups can clip instead of masking.
+WHITESPACE_TABLE = np.array([chr(c).isspace() for c in range(0x3001)] + [False], dtype=np.bool_)
+
+# Extraction is vectorized, so worker processes only pay off once their startup and the
+# pickling of every text are small next to the work; below this many characters in total
+# the annotations are extracted in this process
+MIN_CHARS_FOR_PROCESS_POOL = 5_000_000
+# ProcessPoolExecutor accepts at most 61 workers on Windows
+MAX_EXTRACTION_WORKERS = 61
+# Upper bound on the threads reading annotation files concurrently
+MAX_READER_THREADS = 32
+
+
 def load_variant_dict(dict_path):
     """
     Reads the variant character dictionary file.
@@ -32,6 +54,30 @@ def load_variant_dict(dict_path):
     return variant_groups
 
 
+def read_annotation_file(path):
+    """
+    Reads the full text of one annotation file.
+    The raw bytes are decoded in one call instead of going through the text I/O layer;
+    line breaks are left untranslated, which is harmless since they only act as whitespace.
+    """
+    with open(path, 'rb', buffering=1 << 20) as f:
+        return f.read().decode('utf-8')
+
+
+def count_characters(texts):
+    """
+    Counts the characters of all texts into a Counter.
+    Each text is counted as an array of code points with np.unique, so only the
+    distinct characters pass through Python rather than every character of the corpus.
+    """
+    char_counts = Counter()
+    for text in texts:
+        codepoints = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+        values, counts = np.unique(codepoints, return_counts=True)
+        char_counts.update(dict(zip(map(chr, values.tolist()), counts.tolist())))
+    return char_counts
+
+
 def build_frequency_based_map(variant_groups, global_char_counts):
     """
     Builds an optimal mapping table based on global single-character frequencies.
@@ -42,38 +88,96 @@ def build_frequency_based_map(variant_groups, global_char_counts):
     if not variant_groups:
         return variant_map
 
+    # A Counter returns 0 for unseen characters, so its lookup serves directly as the key
+    counts = global_char_counts if isinstance(global_char_counts, Counter) else Counter(global_char_counts)
+
     for group in variant_groups:
         # Find the character with the highest frequency in the current annotated texts
-        best_char = max(group, key=lambda x: global_char_counts.get(x, 0))
+        best_char = max(group, key=counts.__getitem__)
         for char in group:
             if char != best_char:
                 variant_map[char] = best_char
     return variant_map
 
 
+def build_translation_table(variant_map):
+    """
+    Builds a str.translate table from the variant mapping, so that a whole text
+    can be normalized in one pass.
+    """
+    return str.maketrans(variant_map)
+
+
+def as_translation_table(variant_map):
+    """
+    Returns a str.translate table for either a variant mapping with character keys
+    or a table already built by build_translation_table.
+    """
+    # str.translate silently ignores character keys, so a plain mapping must be converted
+    if any(isinstance(key, str) for key in variant_map):
+        return build_translation_table(variant_map)
+    return variant_map
+
+
+def _split_tokens_numpy(codepoints, whitespace_table):
+    """
+    Vectorized token split: returns the non-whitespace code points and an int8 array
+    marking the last character of every token.
+    """
+    is_space = whitespace_table[np.minimum(codepoints, len(whitespace_table) - 1)]
+
+    # A character is a boundary (1) when it is followed by whitespace or ends the text
+    is_boundary = np.ones(len(codepoints), dtype=bool)
+    is_boundary[:-1] = is_space[1:]
+
+    is_char = ~is_space
+    # Booleans are stored as single 0/1 bytes, so the int8 labels are a view, not a copy
+    return codepoints[is_char], is_boundary[is_char].view(np.int8)
+
+
+def _split_tokens_loop(codepoints, whitespace_table):
+    """
+    Single-pass form of the token split, used when numba is available to compile it.
+    Both outputs are allocated once at the input length and trimmed at the end.
+    """
+    n = codepoints.size
+    chars = np.empty(n, dtype=np.uint32)
+    boundaries = np.empty(n, dtype=np.int8)
+    j = 0
+    for i in range(n):
+        c = codepoints[i]
+        if c < whitespace_table.size and whitespace_table[c]:
+            if j > 0:
+                boundaries[j - 1] = 1
+            continue
+        chars[j] = c
+        boundaries[j] = 0
+        j += 1
+    if j > 0:
+        boundaries[j - 1] = 1
+    return chars[:j], boundaries[:j]
+
+
+if njit is not None:
+    split_tokens = njit(cache=True)(_split_tokens_loop)
+else:
+    split_tokens = _split_tokens_numpy
+
+
 def extract_boundaries(segmented_text, variant_map):
     """
     Converts segmented text into a character sequence (with variant normalization applied)
-    and a sequence of boundary labels.
+    and a sequence of boundary labels. variant_map may also be a table prebuilt with
+    build_translation_table, which avoids converting the mapping on every call.
     Label '1' indicates the end of a word (boundary), '0' indicates within a word.
+    Boundary labels are returned as an int8 NumPy array.
     """
-    tokens = segmented_text.split()
-    chars = []
-    boundaries = []
-
-    for token in tokens:
-        for i, char in enumerate(token):
-            # Apply variant character normalization mapping
-            normalized_char = variant_map.get(char, char)
-            chars.append(normalized_char)
-
-            # If it's the last character of the token, mark as a boundary (1)
-            if i == len(token) - 1:
-                boundaries.append(1)
-            else:
-                boundaries.append(0)
+    codepoints = np.frombuffer(segmented_text.encode('utf-32-le'), dtype=np.uint32)
+    char_codes, boundaries = split_tokens(codepoints, WHITESPACE_TABLE)
 
-    return "".join(chars), boundaries
+    # Apply variant character normalization mapping in a single pass over the kept characters
+    chars = char_codes.tobytes().decode('utf-32-le').translate(as_translation_table(variant_map))
+    return chars, boundaries
 
 
 def fleiss_kappa(ratings_matrix):
@@ -82,11 +186,17 @@ def fleiss_kappa(ratings_matrix):
     Formula: \kappa = \frac{\bar{P} - P_e}{1 - P_e}
     """
     N, k = ratings_matrix.shape
-    n = np.sum(ratings_matrix[0])  # Number of annotators
+    n = np.sum(ratings_matrix[0], dtype=np.int64) if N else 0  # Number of annotators
 
-    p_j = np.sum(ratings_matrix, axis=0) / (N * n)
+    # Agreement is undefined without items and trivially perfect for a single annotator
+    if n < 2:
+        return float('nan') if N == 0 else 1.0
+
+    # Accumulate in int64 so narrow integer matrices (e.g. int8) cannot overflow;
+    # einsum squares and sums each row in one pass without a squared temporary
+    p_j = np.sum(ratings_matrix, axis=0, dtype=np.int64) / (N * n)
     P_e = np.sum(p_j ** 2)
-    P_i = (np.sum(ratings_matrix ** 2, axis=1) - n) / (n * (n - 1))
+    P_i = (np.einsum('ij,ij->i', ratings_matrix, ratings_matrix, dtype=np.int64) - n) / (n * (n - 1))
     P_bar = np.mean(P_i)
 
     # Prevent division by zero if there's perfect agreement by chance
@@ -96,81 +206,131 @@ def fleiss_kappa(ratings_matrix):
     return (P_bar - P_e) / (1 - P_e)
 
 
+def fleiss_kappa_binary(split_votes, n):
+    """
+    Fleiss' Kappa specialized for two categories (split / no split), computed
+    directly from the per-character split votes of n annotators.
+    """
+    N = split_votes.size
+
+    # Agreement is undefined without items and trivially perfect for a single annotator
+    if N == 0:
+        return float('nan')
+    if n < 2:
+        return 1.0
+
+    vote_sum = int(split_votes.sum(dtype=np.int64))
+    vote_square_sum = int(np.einsum('i,i->', split_votes, split_votes, dtype=np.int64))
+
+    p1 = vote_sum / (N * n)
+    p0 = 1 - p1
+    P_e = p0 * p0 + p1 * p1
+
+    # Sum over characters of n_ij * (n_ij - 1) for both categories; with s split votes,
+    # s(s - 1) + (n - s)(n - s - 1) = 2s^2 - 2ns + n(n - 1), so no no-split array is needed
+    agreeing_pairs = 2 * vote_square_sum - 2 * n * vote_sum + N * n * (n - 1)
+    P_bar = agreeing_pairs / (N * n * (n - 1))
+
+    # Prevent division by zero if there's perfect agreement by chance
+    if P_e == 1.0:
+        return 1.0
+
+    return (P_bar - P_e) / (1 - P_e)
+
+
 def process_annotations(file_paths, dict_path):
     """
     Main pipeline: Reads annotations, normalizes characters, aligns sequences,
     calculates Fleiss' Kappa, and generates the adjudicated text.
     """
-    # 1. Pre-read all texts and calculate global character frequencies
-    all_raw_texts = []
-    global_counter = Counter()
+    # 1. Pre-read all texts concurrently and calculate global character frequencies
+    if not file_paths:
+        raise ValueError("No annotation files were provided.")
+
+    with ThreadPoolExecutor(max_workers=min(len(file_paths), MAX_READER_THREADS)) as executor:
+        all_raw_texts = list(executor.map(read_annotation_file, file_paths))
 
-    for path in file_paths:
-        with open(path, 'r', encoding='utf-8') as f:
-            t = f.read()
-            all_raw_texts.append(t)
-            # Remove spaces and line breaks for accurate character frequency counting
-            global_counter.update(t.replace(" ", "").replace("\n", "").replace("\r", ""))
+    global_counter = count_characters(all_raw_texts)
+
+    # Drop spaces and line breaks for accurate character frequency counting;
+    # this avoids copying every text just to strip them before counting
+    for whitespace in (" ", "\n", "\r"):
+        global_counter.pop(whitespace, None)
 
     # 2. Build the variant character mapping table
     variant_groups = load_variant_dict(dict_path)
     variant_map = build_frequency_based_map(variant_groups, global_counter)
     print(f"Loaded {len(variant_groups)} variant groups, constructed {len(variant_map)} mapping rules.")
+    trans_table = build_translation_table(variant_map)
 
-    # 3. Extract boundaries and check for character alignment across annotators
-    all_boundaries = []
+    # 3. Extract boundaries, check for character alignment across annotators and
+    # count split votes per character as each file is processed. Kappa and voting only
+    # need these votes, so no (n_annotators, N_chars) boundary matrix is kept.
+    split_votes = None
     base_chars = None
+    base_codes = None
+
+    # Extraction of the files is independent, so large inputs are spread over worker processes
+    n_workers = min(len(all_raw_texts), os.cpu_count() or 1, MAX_EXTRACTION_WORKERS)
+    if n_workers > 1 and sum(map(len, all_raw_texts)) >= MIN_CHARS_FOR_PROCESS_POOL:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            extracted = list(executor.map(extract_boundaries, all_raw_texts, repeat(trans_table)))
+    else:
+        extracted = [extract_boundaries(text, trans_table) for text in all_raw_texts]
 
-    for i, text in enumerate(all_raw_texts):
-        chars, boundaries = extract_boundaries(text, variant_map)
+    for i, (chars, boundaries) in enumerate(extracted):
+        chars_codes = np.frombuffer(chars.encode('utf-32-le'), dtype=np.uint32)
 
         if base_chars is None:
+            # The base text's code points serve both the comparison and the final assembly
             base_chars = chars
+            base_codes = chars_codes
+            split_votes = np.zeros(len(chars), dtype=np.int32)
         else:
             # Strictly verify that all annotators segmented the exact same raw text
-            if base_chars != chars:
-                # Find the first mismatched index for debugging purposes
-                diff_idx = next((j for j, (a, b) in enumerate(zip(base_chars, chars)) if a != b), -1)
+            if not np.array_equal(base_codes, chars_codes):
+                # Find the first mismatched index for debugging purposes from the same arrays
+                common = min(len(base_codes), len(chars_codes))
+                mismatches = np.flatnonzero(base_codes[:common] != chars_codes[:common])
+                diff_idx = int(mismatches[0]) if mismatches.size else -1
                 context = chars[max(0, diff_idx - 5): diff_idx + 5]
                 raise ValueError(
                     f"Text misalignment detected! File '{file_paths[i]}' differs from the base file at character index {diff_idx} (Context: ...{''.join(context)}...). Please ensure raw texts are identical.")
 
-        all_boundaries.append(boundaries)
+        split_votes += boundaries
 
-    all_boundaries = np.array(all_boundaries)
-    n_annotators, N_chars = all_boundaries.shape
+    n_annotators, N_chars = len(all_raw_texts), len(base_codes)
     print(f"Detected {n_annotators} annotators, totaling {N_chars} characters.")
 
-    # 4. Construct the Ratings Matrix for Kappa calculation
-    # ratings_matrix shape: (N_chars, 2) -> [votes for '0' (no split), votes for '1' (split)]
-    ratings_matrix = np.zeros((N_chars, 2), dtype=int)
-    for i in range(N_chars):
-        split_votes = np.sum(all_boundaries[:, i])
-        ratings_matrix[i][0] = n_annotators - split_votes
-        ratings_matrix[i][1] = split_votes
-
-    # Calculate and output Fleiss' Kappa
-    kappa = fleiss_kappa(ratings_matrix)
-    print(f"==> Fleiss' Kappa: {kappa:.4f}")
+    # 4. Calculate and output Fleiss' Kappa
+    # The binary Kappa works on the split votes directly, without a ratings matrix
+    if n_annotators < 2:
+        print("Warning: Fleiss' Kappa requires at least 2 annotators; skipping the agreement calculation.")
+    else:
+        kappa = fleiss_kappa_binary(split_votes, n_annotators)
+        print(f"==> Fleiss' Kappa: {kappa:.4f}")
 
     # 5. Generate Gold Standard Draft using Majority Voting
-    adjudicated_text = []
-    conflict_count = 0
-
-    for i in range(N_chars):
-        adjudicated_text.append(base_chars[i])
-        split_votes = ratings_matrix[i][1]
-
-        # Absolute majority agrees to split
-        if split_votes > n_annotators / 2:
-            adjudicated_text.append(" ")
-        # Tie conflict (e.g., 2 vs 2), requires manual adjudication
-        elif split_votes == n_annotators / 2:
-            conflict_count += 1
-            adjudicated_text.append("[?]")
-
-    # Clean up double spaces if any, and strip trailing spaces
-    final_text = "".join(adjudicated_text).replace("  ", " ").strip()
+    # Each character is followed by a suffix chosen from its split votes
+    # Absolute majority agrees to split
+    is_split = split_votes * 2 > n_annotators
+    # Tie conflict (e.g., 2 vs 2), requires manual adjudication
+    is_tie = split_votes * 2 == n_annotators
+    conflict_count = int(is_tie.sum())
+
+    # Assemble the text as unboxed code points rather than one Python string per character:
+    # every character is written at its shifted position, followed by " " or "[?]"
+    suffix_lengths = is_split.astype(np.int64) + 3 * is_tie
+    starts = np.arange(N_chars) + np.cumsum(suffix_lengths) - suffix_lengths
+    adjudicated_codes = np.empty(N_chars + suffix_lengths.sum(), dtype=np.uint32)
+    adjudicated_codes[starts] = base_codes
+    adjudicated_codes[starts[is_split] + 1] = ord(" ")
+    for offset, marker_char in enumerate("[?]", start=1):
+        adjudicated_codes[starts[is_tie] + offset] = ord(marker_char)
+
+    # Each character carries at most one suffix and characters are never whitespace,
+    # so double spaces cannot occur; only the trailing space needs stripping
+    final_text = adjudicated_codes.tobytes().decode('utf-32-le').strip()
     print(f"Identified {conflict_count} instances of tie conflicts (marked with '[?]').")
 
     return final_text